@@ -3,13 +3,17 @@
 автоматически расширяющее окно под размер загруженного изображения.
 """
 
+from __future__ import annotations
+
 import logging
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
+import threading
+
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox
 
+# cv2, numpy и PIL импортируются лениво внутри методов: их загрузка
+# (десятки мегабайт разделяемых библиотек) не задерживает появление окна
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +28,13 @@ class ImageEditorApp:
         GUI-приложение для базовой обработки изображений:
         загрузка, видео-кадр, каналы, маскирование, резкость и рисование.
     """
+
+    # До этого числа пикселей RGB-кадр отдаётся Tk как PPM, минуя PIL
+    _PPM_MAX_PIXELS = 512 * 512
+
+    # Сколько PIL-буферов разных размеров/режимов держать в пуле
+    _IMG_POOL_MAX = 4
+
     def __init__(self, root: tk.Tk):
         """
         Инициализирует окно приложения, настраивает панель инструментов и область отображения.
@@ -39,6 +50,21 @@ class ImageEditorApp:
         self.img = None              # текущее изображение (numpy RGB)
         self.prev_img = None         # предыдущее состояние изображения
         self.tk_img = None           # для отображения через ImageTk
+        self._tk_mode = None         # режим PIL текущего PhotoImage
+        self._last_shape = None      # размер (w, h) последнего показа
+        self._pending_resize = False  # запланирована ли подгонка окна
+        self._scratch = None         # переиспользуемый буфер для рисования
+        self._cap = None             # кэшированный VideoCapture веб-камеры
+        self._rgb_buf = None         # переиспользуемый RGB-буфер для кадров
+        self._channels = None        # кэш непрерывных R/G/B-плоскостей
+        self._last_op_key = None     # ключ последней выполненной операции
+        self._last_op_result = None  # её результат для повторного показа
+        self._img_pool = {}          # пул PIL-буферов по (форма, dtype, режим)
+        self._dst_buf = None         # переиспользуемый dst-буфер фильтров
+
+        # Ядро резкости (float32) создаётся при первом вызове sharpen
+        # и дальше переиспользуется без переконвертаций
+        self._sharpen_kernel = None
 
         # Единая панель инструментов
         self.toolbar = tk.Frame(self.root, bd=1, relief=tk.RAISED)
@@ -86,27 +112,113 @@ class ImageEditorApp:
         btn_specs = [
             ("Маска по красному", self.red_mask),
             ("Резкость", self.sharpen),
+            ("Мягкая резкость", self.sharpen_unsharp),
             ("Рисовать прямоугольник", self.draw_rectangle),
             ("Отменить", self.undo),
             ("Выход", self.root.quit)  # Добавлена кнопка выхода
         ]
+        # Общие опции собираем один раз, а не пересоздаём на каждой итерации
+        common = {"relief": tk.RAISED, "bd": 1}
         for text, cmd in btn_specs:
-            tk.Button(self.toolbar, text=text, command=cmd).pack(side=tk.LEFT, padx=4)
+            tk.Button(self.toolbar, text=text, command=cmd, **common).pack(side=tk.LEFT, padx=4)
 
-    def _update_display(self, img_array: np.ndarray):
+    def _update_display(self, img_array: np.ndarray, mode: str | None = None):
         """
         Обновляет область отображения новым изображением и подгоняет размер окна.
 
+        Данные остаются однобайтовыми на пиксель по всему конвейеру:
+        2D-массив отображается как "L" без раздувания в RGB.
+
+        Args:
+            img_array (np.ndarray): Изображение для отображения.
+            mode (str | None): Режим PIL; по умолчанию выводится из формы
+                массива ("RGB" для HxWx3, "L" для HxW).
+        """
+        import cv2
+        import numpy as np
+        from PIL import ImageTk
+
+        if mode is None:
+            mode = "RGB" if img_array.ndim == 3 else "L"
+
+        # Крупные изображения уменьшаем только для показа: self.img и все
+        # операции остаются в полном разрешении
+        img_h, img_w = img_array.shape[:2]
+        max_w = max(self.root.winfo_screenwidth() - 100, 1)
+        max_h = max(self.root.winfo_screenheight() - 150, 1)
+        scale = min(1.0, max_w / img_w, max_h / img_h)
+        if scale < 1.0:
+            img_array = cv2.resize(img_array, None, fx=scale, fy=scale,
+                                   interpolation=cv2.INTER_AREA)
+            img_h, img_w = img_array.shape[:2]
+
+        # Быстрый путь для небольших кадров: непрерывный uint8 RGB кодируем
+        # как PPM и скармливаем напрямую Tk — без слоя PIL и его копий
+        if (mode == "RGB" and img_array.ndim == 3
+                and img_array.dtype == np.uint8
+                and img_array.flags["C_CONTIGUOUS"]
+                and img_w * img_h <= self._PPM_MAX_PIXELS):
+            ppm = b"P6\n%d %d\n255\n" % (img_w, img_h) + img_array.tobytes()
+            self.tk_img = tk.PhotoImage(data=ppm, format="ppm")
+            self._tk_mode = None  # нативный PhotoImage не совместим с paste()
+            self.canvas.config(image=self.tk_img)
+        # Переиспользуем существующий PhotoImage того же размера и режима:
+        # paste() пишет пиксели в уже выделенный буфер без новой аллокации.
+        elif (self.tk_img is not None and self._tk_mode == mode
+                and (self.tk_img.width(), self.tk_img.height()) == (img_w, img_h)):
+            self.tk_img.paste(self._pooled_image(img_array, mode))
+        else:
+            self.tk_img = ImageTk.PhotoImage(self._pooled_image(img_array, mode))
+            self._tk_mode = mode
+            self.canvas.config(image=self.tk_img)
+
+        # Размер окна пересчитываем только при смене размера изображения;
+        # подгонку откладываем через after_idle, чтобы несколько быстрых
+        # обновлений схлопнулись в один проход компоновки Tk
+        if self._last_shape == (img_w, img_h):
+            return
+        self._last_shape = (img_w, img_h)
+        if not self._pending_resize:
+            self._pending_resize = True
+            self.root.after_idle(self._resize_to_image)
+
+    def _pooled_image(self, img_array: np.ndarray, mode: str) -> "Image.Image":
+        """
+        Возвращает PIL-изображение для отображения, переиспользуя буфер
+        из пула того же размера/типа/режима вместо новой аллокации.
+
         Args:
-            img_array (np.ndarray): RGB-изображение для отображения.
+            img_array (np.ndarray): Пиксельные данные.
+            mode (str): Режим PIL ("RGB" или "L").
         """
-        img = Image.fromarray(img_array)
-        self.tk_img = ImageTk.PhotoImage(img)
-        self.canvas.config(image=self.tk_img)
+        from PIL import Image
+
+        key = (img_array.shape, img_array.dtype.str, mode)
+        img = self._img_pool.pop(key, None)
+        if img is None:
+            # frombytes копирует данные: пул владеет своим буфером и не
+            # делит память с исходным массивом (fromarray в режиме "L"
+            # отдал бы изображение поверх памяти самого массива, и
+            # попадание в пул затирало бы его, например кэш каналов)
+            h, w = img_array.shape[:2]
+            img = Image.frombytes(mode, (w, h), img_array.tobytes())
+        else:
+            img.frombytes(img_array.tobytes())
+        # Повторная вставка держит пул в порядке «давно не использован — в начале»
+        self._img_pool[key] = img
+        while len(self._img_pool) > self._IMG_POOL_MAX:
+            del self._img_pool[next(iter(self._img_pool))]
+        return img
 
-        # Обновляем окно и измеряем размеры изображения
-        self.root.update_idletasks()
-        img_w, img_h = self.tk_img.width(), self.tk_img.height()
+    def _resize_to_image(self):
+        """
+        Подгоняет размер окна под текущее изображение.
+        Вызывается отложенно через after_idle из _update_display.
+        """
+        self._pending_resize = False
+        if self._last_shape is None:
+            return
+        img_w, img_h = self._last_shape
         toolbar_h = self.toolbar.winfo_height()
 
         # Вычисляем новый размер окна с учётом отступов
@@ -118,16 +230,28 @@ class ImageEditorApp:
 
     def open_file(self):
         """
-        Открывает диалог выбора файла и загружает изображение через PIL,
-        поддерживает пути с кириллицей.
+        Открывает диалог выбора файла и загружает изображение через
+        cv2.imdecode (libjpeg-turbo, SIMD), поддерживает пути с кириллицей.
+        При неподдерживаемом OpenCV формате откатывается на PIL.
         """
         path = filedialog.askopenfilename(filetypes=[("Image files", "*.png;*.jpg;*.jpeg")])
         if not path:
             return
+        import cv2
+        import numpy as np
+        from PIL import Image
         try:
-            pil_img = Image.open(path).convert("RGB")
+            # np.fromfile читает байты сам, поэтому кириллица в пути не мешает
+            data = np.fromfile(path, dtype=np.uint8)
+            bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            if bgr is not None:
+                img = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            else:
+                img = np.array(Image.open(path).convert("RGB"))
             self.prev_img = None
-            self.img = np.array(pil_img)
+            self.img = img
+            self._channels = None
+            self._last_op_key = None
             logger.info(f"Загружено изображение: {path}")
             self._update_display(self.img)
         except Exception as e:
@@ -136,19 +260,47 @@ class ImageEditorApp:
 
     def capture_from_cam(self):
         """
-        Захватывает один кадр с веб-камеры и отображает его.
+        Запускает захват кадра с веб-камеры в фоновом потоке,
+        чтобы инициализация камеры не блокировала главный цикл Tkinter.
         """
-        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        if not cap.isOpened():
-            messagebox.showerror("Ошибка", "Не удалось открыть веб-камеру")
+        threading.Thread(target=self._cam_worker, daemon=True).start()
+
+    def _cam_worker(self):
+        """
+        Открывает (или переиспользует) камеру и читает кадр в фоновом потоке,
+        затем передаёт результат в главный поток через root.after.
+        """
+        import cv2
+        if self._cap is None or not self._cap.isOpened():
+            self._cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+        if not self._cap.isOpened():
+            self.root.after(0, messagebox.showerror,
+                            "Ошибка", "Не удалось открыть веб-камеру")
             return
-        ret, frame = cap.read()
-        cap.release()
+        ret, frame = self._cap.read()
         if not ret:
-            messagebox.showerror("Ошибка", "Не удалось захватить кадр")
+            self.root.after(0, messagebox.showerror,
+                            "Ошибка", "Не удалось захватить кадр")
             return
+        self.root.after(0, self._finish_capture, frame)
+
+    def _finish_capture(self, frame: np.ndarray):
+        """
+        Преобразует захваченный BGR-кадр в RGB и отображает его.
+        Выполняется в главном потоке Tkinter.
+
+        Args:
+            frame (np.ndarray): BGR-кадр с веб-камеры.
+        """
+        import cv2
+        import numpy as np
         self.prev_img = None
-        self.img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        self.img = self._rgb_buf
+        self._channels = None
+        self._last_op_key = None
         logger.info("Снимок с веб-камеры сделан")
         self._update_display(self.img)
 
@@ -162,12 +314,22 @@ class ImageEditorApp:
         if self.img is None:
             messagebox.showwarning("Внимание", "Сначала загрузите изображение")
             return
+        key = ("channel", channel, id(self.img))
+        if key == self._last_op_key:
+            self._update_display(self._last_op_result)
+            return
+        import cv2
         self.prev_img = self.img.copy()
         idx = {"R": 0, "G": 1, "B": 2}[channel]
-        ch = self.img[:, :, idx]
-        rgb = np.stack([ch] * 3, axis=-1)
+        # cv2.split даёт три непрерывных буфера: повторные переключения
+        # каналов читают их без страйдового обхода исходного массива
+        if self._channels is None:
+            self._channels = cv2.split(self.img)
+        ch = self._channels[idx]
+        self._last_op_key = key
+        self._last_op_result = ch
         logger.info(f"Показан канал {channel}")
-        self._update_display(rgb)
+        self._update_display(ch)
 
     def red_mask(self):
         """
@@ -180,11 +342,18 @@ class ImageEditorApp:
         thresh = simpledialog.askinteger("Порог", "Задайте порог (0–255)", minvalue=0, maxvalue=255)
         if thresh is None:
             return
+        key = ("mask", thresh, id(self.img))
+        if key == self._last_op_key:
+            self._update_display(self._last_op_result)
+            return
+        import cv2
         self.prev_img = self.img.copy()
-        mask = (self.img[:, :, 0] > thresh).astype(np.uint8) * 255
-        rgb = np.stack([mask] * 3, axis=-1)
+        red = cv2.extractChannel(self.img, 0)
+        _, mask = cv2.threshold(red, thresh, 255, cv2.THRESH_BINARY)
+        self._last_op_key = key
+        self._last_op_result = mask
         logger.info(f"Маска по красному > {thresh}")
-        self._update_display(rgb)
+        self._update_display(mask)
 
     def sharpen(self):
         """
@@ -193,12 +362,55 @@ class ImageEditorApp:
         if self.img is None:
             messagebox.showwarning("Внимание", "Сначала загрузите изображение")
             return
+        key = ("sharpen", id(self.img))
+        if key == self._last_op_key:
+            self._update_display(self._last_op_result)
+            return
+        import cv2
+        import numpy as np
         self.prev_img = self.img.copy()
-        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
-        sharp = cv2.filter2D(self.img, -1, kernel)
+        if self._sharpen_kernel is None:
+            self._sharpen_kernel = np.array(
+                [[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
+        # filter2D пишет в переиспользуемый dst-буфер вместо новой аллокации
+        if self._dst_buf is None or self._dst_buf.shape != self.img.shape:
+            self._dst_buf = np.empty_like(self.img)
+        sharp = cv2.filter2D(self.img, -1, self._sharpen_kernel,
+                             dst=self._dst_buf)
+        self._last_op_key = key
+        self._last_op_result = sharp
         logger.info("Применён фильтр резкости")
         self._update_display(sharp)
 
+    def sharpen_unsharp(self):
+        """
+        Повышает резкость методом нерезкого маскирования:
+        из изображения вычитается его гауссово размытие.
+        """
+        if self.img is None:
+            messagebox.showwarning("Внимание", "Сначала загрузите изображение")
+            return
+        key = ("unsharp", id(self.img))
+        if key == self._last_op_key:
+            self._update_display(self._last_op_result)
+            return
+        import cv2
+        import numpy as np
+        self.prev_img = self.img.copy()
+        if self._dst_buf is None or self._dst_buf.shape != self.img.shape:
+            self._dst_buf = np.empty_like(self.img)
+        # GaussianBlur разложен внутри OpenCV на два 1D-прохода (строки и
+        # столбцы): 2*K операций на пиксель вместо K^2 у полного 2D-ядра;
+        # размытие и результат пишутся в один dst-буфер (поэлементная
+        # операция addWeighted безопасна на месте)
+        blur = cv2.GaussianBlur(self.img, (0, 0), sigmaX=1.0,
+                                dst=self._dst_buf)
+        sharp = cv2.addWeighted(self.img, 1.5, blur, -0.5, 0, dst=blur)
+        self._last_op_key = key
+        self._last_op_result = sharp
+        logger.info("Применено нерезкое маскирование")
+        self._update_display(sharp)
+
     def draw_rectangle(self):
         """
         Рисует синий контур прямоугольника по координатам, введённым пользователем.
@@ -206,17 +418,27 @@ class ImageEditorApp:
         if self.img is None:
             messagebox.showwarning("Внимание", "Сначала загрузите изображение")
             return
-        x1 = simpledialog.askinteger("X1", "Введите X1", minvalue=0)
-        y1 = simpledialog.askinteger("Y1", "Введите Y1", minvalue=0)
-        x2 = simpledialog.askinteger("X2", "Введите X2", minvalue=0)
-        y2 = simpledialog.askinteger("Y2", "Введите Y2", minvalue=0)
-        if None in (x1, y1, x2, y2):
+        # Один диалог вместо четырёх модальных окон подряд
+        s = simpledialog.askstring("Координаты", "Введите x1,y1,x2,y2")
+        if not s:
+            return
+        try:
+            x1, y1, x2, y2 = (int(v) for v in s.split(","))
+        except ValueError:
+            messagebox.showerror("Ошибка", "Ожидаются четыре целых числа через запятую")
+            return
+        if min(x1, y1, x2, y2) < 0:
+            messagebox.showerror("Ошибка", "Координаты должны быть неотрицательными")
             return
+        import cv2
+        import numpy as np
         self.prev_img = self.img.copy()
-        img_copy = self.img.copy()
-        cv2.rectangle(img_copy, (x1, y1), (x2, y2), (0, 0, 255), thickness=2)
+        if self._scratch is None or self._scratch.shape != self.img.shape:
+            self._scratch = np.empty_like(self.img)
+        np.copyto(self._scratch, self.img)
+        cv2.rectangle(self._scratch, (x1, y1), (x2, y2), (0, 0, 255), thickness=2)
         logger.info(f"Нарисован прямоугольник: ({x1},{y1})->({x2},{y2})")
-        self._update_display(img_copy)
+        self._update_display(self._scratch)
 
     def undo(self):
         """
@@ -224,6 +446,8 @@ class ImageEditorApp:
         """
         if self.prev_img is not None:
             self.img = self.prev_img.copy()
+            self._channels = None
+            self._last_op_key = None
             self._update_display(self.img)
             logger.info("Откат к предыдущему изображению выполнен")
         else: